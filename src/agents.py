@@ -1,18 +1,23 @@
 """
 Agent implementations for the AI Research Assistant
 """
+import asyncio
+import itertools
 import logging
-from typing import List, Dict, Any
+import re
+from typing import AsyncIterator, List, Dict, Any, Tuple, Union
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from langchain_core.messages import get_buffer_string
 
-from models import Analyst, Perspectives, SearchQuery
-from config import PromptTemplates
+from models import Analyst, FinalReport, Perspectives, SearchQueries
+from config import PromptTemplates, settings
 from services import LLMService, SearchService
 
 
 logger = logging.getLogger(__name__)
 
+# Fallback for analysts that close without the end-of-interview token
+_END_RE = re.compile(r"Thank you so much for your help")
+
 
 class AnalystGenerator:
     """Agent for generating research analysts"""
@@ -20,7 +25,7 @@ class AnalystGenerator:
     def __init__(self, llm_service: LLMService):
         self.llm_service = llm_service
     
-    def generate_analysts(
+    async def generate_analysts(
         self,
         topic: str,
         max_analysts: int,
@@ -46,7 +51,7 @@ class AnalystGenerator:
         ]
         
         try:
-            perspectives = structured_llm.invoke(messages)
+            perspectives = await structured_llm.ainvoke(messages)
             logger.info(f"Successfully generated {len(perspectives.analysts)} analysts")
             return perspectives.analysts
         except Exception as e:
@@ -60,101 +65,166 @@ class InterviewAgent:
     def __init__(self, llm_service: LLMService, search_service: SearchService):
         self.llm_service = llm_service
         self.search_service = search_service
+        
+        # System prompts are invariant across turns, so build them once
+        self._search_sys_msg = SystemMessage(
+            content=PromptTemplates.SEARCH_QUERY_GENERATION.format(
+                max_queries=settings.max_search_queries
+            )
+        )
+        self._question_sys_msgs: Dict[Analyst, SystemMessage] = {}
+        self._answer_sys_msgs: Dict[Analyst, SystemMessage] = {}
     
-    def conduct_interview(
+    async def gather_context(
         self,
         analyst: Analyst,
         topic: str,
         max_turns: int = 2
-    ) -> str:
-        """Conduct an interview and return the section content"""
+    ) -> List[str]:
+        """Run the interview Q&A and return the search context it gathered"""
         logger.info(f"Starting interview with {analyst.name}")
         
         messages = [HumanMessage(content=f"So you said you were writing an article on {topic}?")]
         context = []
         
         for turn in range(max_turns):
-            # Generate question
-            question = self._generate_question(analyst, messages)
+            # Generate question, reusing the one drafted with the analyst if any
+            if turn == 0 and analyst.opening_question:
+                question = AIMessage(content=analyst.opening_question, name="analyst")
+            else:
+                question = await self._generate_question(analyst, messages)
             messages.append(question)
             
             # Check if interview is complete
-            if "Thank you so much for your help" in question.content:
+            if (
+                question.content.startswith(PromptTemplates.END_INTERVIEW_TOKEN)
+                or _END_RE.search(question.content)
+            ):
                 logger.info(f"Interview completed early at turn {turn + 1}")
                 break
             
-            # Generate search query
-            search_query = self._generate_search_query(messages)
+            # Generate search queries
+            search_queries = await self._generate_search_queries(messages)
             
             # Search for information
-            search_results = self.search_service.search(search_query)
+            search_results = await self._search_all(search_queries)
             formatted_results = self.search_service.format_search_results(search_results)
             
             if formatted_results:
                 context.append(formatted_results)
                 
-                # Generate answer
-                answer = self._generate_answer(analyst, messages, formatted_results)
-                messages.append(answer)
+                # Sections are written from the search context alone, so the
+                # last answer would only feed a question that is never asked
+                if turn < max_turns - 1:
+                    answer = await self._generate_answer(analyst, messages, formatted_results)
+                    messages.append(answer)
             else:
-                logger.warning(f"No search results for query: {search_query}")
+                logger.warning(f"No search results for queries: {search_queries}")
         
-        # Write section
-        section = self._write_section(analyst, context)
         logger.info(f"Interview with {analyst.name} completed")
+        return context
+    
+    async def write_sections_as_completed(
+        self,
+        pairs: List[Tuple[Analyst, List[str]]],
+        batch_size: int = 8
+    ) -> AsyncIterator[Tuple[int, Union[str, Exception]]]:
+        """Write report sections for several analysts concurrently
         
-        return section
+        Yields ``(index, section)`` pairs as sections finish; failed items
+        yield their exception in place of the section.
+        """
+        if not pairs:
+            return
+        
+        logger.info(f"Writing {len(pairs)} sections concurrently")
+        async for index, result in self.llm_service.abatch_as_completed(
+            [self._section_messages(analyst, context) for analyst, context in pairs],
+            max_concurrency=batch_size
+        ):
+            yield index, result if isinstance(result, Exception) else result.content
     
-    def _generate_question(self, analyst: Analyst, messages: List[Any]) -> AIMessage:
+    async def _generate_question(self, analyst: Analyst, messages: List[Any]) -> AIMessage:
         """Generate interview question"""
-        prompt = PromptTemplates.INTERVIEW_QUESTION.format(
-            analyst_persona=analyst.persona
-        )
+        system_message = self._question_sys_msgs.get(analyst)
+        if system_message is None:
+            system_message = SystemMessage(
+                content=PromptTemplates.INTERVIEW_QUESTION.format(
+                    analyst_persona=analyst.persona
+                )
+            )
+            self._question_sys_msgs[analyst] = system_message
         
-        question = self.llm_service.invoke([SystemMessage(content=prompt)] + messages)
+        question = await self.llm_service.ainvoke([system_message] + messages)
         question.name = "analyst"
         return question
     
-    def _generate_search_query(self, messages: List[Any]) -> str:
-        """Generate search query from conversation"""
-        structured_llm = self.llm_service.get_structured_llm(SearchQuery)
+    async def _generate_search_queries(self, messages: List[Any]) -> List[str]:
+        """Generate complementary search queries from conversation"""
+        structured_llm = self.llm_service.get_structured_llm(SearchQueries)
         
-        search_instructions = SystemMessage(content=PromptTemplates.SEARCH_QUERY_GENERATION)
-        search_query = structured_llm.invoke([search_instructions] + messages)
+        search_queries = await structured_llm.ainvoke([self._search_sys_msg] + messages)
         
-        return search_query.search_query
+        return search_queries.queries[:settings.max_search_queries]
     
-    def _generate_answer(
+    async def _search_all(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Run all queries concurrently and merge results, deduplicated by URL"""
+        # Skip queries that only differ in case or whitespace
+        unique_queries: Dict[str, str] = {}
+        for query in queries:
+            unique_queries.setdefault(self.search_service.normalize_query(query), query)
+        
+        result_lists = await asyncio.gather(
+            *(self.search_service.asearch(query) for query in unique_queries.values())
+        )
+        
+        seen_urls = set()
+        merged = []
+        for doc in itertools.chain.from_iterable(result_lists):
+            url = doc.get("url")
+            if url in seen_urls:
+                continue
+            if url:
+                seen_urls.add(url)
+            merged.append(doc)
+        
+        return merged
+    
+    async def _generate_answer(
         self,
         analyst: Analyst,
         messages: List[Any],
         context: str
     ) -> AIMessage:
         """Generate expert answer"""
-        prompt = PromptTemplates.EXPERT_ANSWER.format(
-            goals=analyst.persona,
-            context=context
-        )
+        system_message = self._answer_sys_msgs.get(analyst)
+        if system_message is None:
+            system_message = SystemMessage(
+                content=PromptTemplates.EXPERT_ANSWER.format(goals=analyst.persona)
+            )
+            self._answer_sys_msgs[analyst] = system_message
         
-        answer = self.llm_service.invoke([SystemMessage(content=prompt)] + messages)
+        # Context goes last so the system prompt stays identical across turns
+        answer = await self.llm_service.ainvoke(
+            [system_message]
+            + messages
+            + [HumanMessage(content=f"Context:\n\n{context}")]
+        )
         answer.name = "expert"
         return answer
     
-    def _write_section(self, analyst: Analyst, context: List[str]) -> str:
-        """Write report section"""
+    def _section_messages(self, analyst: Analyst, context: List[str]) -> List[Any]:
+        """Build the section-writing messages for an analyst"""
         all_context = "\n\n".join(context)
         
         prompt = PromptTemplates.SECTION_WRITER.format(
             analyst_description=analyst.description
         )
         
-        messages = [
+        return [
             SystemMessage(content=prompt),
             HumanMessage(content=f"Use this source to write your section: {all_context}")
         ]
-        
-        section = self.llm_service.invoke(messages)
-        return section.content
 
 
 class ReportWriter:
@@ -163,67 +233,36 @@ class ReportWriter:
     def __init__(self, llm_service: LLMService):
         self.llm_service = llm_service
     
-    def write_report(self, sections: List[str], topic: str) -> str:
+    async def write_report(self, sections: List[str], topic: str) -> str:
         """Generate the final report"""
         logger.info("Starting final report generation")
         
-        # Generate main content
-        content = self._generate_content(sections, topic)
-        
-        # Generate introduction
-        introduction = self._generate_intro_conclusion(sections, topic, "introduction")
-        
-        # Generate conclusion
-        conclusion = self._generate_intro_conclusion(sections, topic, "conclusion")
+        # Generate main content, introduction and conclusion in one call
+        report = await self._generate_report_parts(sections, topic)
         
         # Compile final report
-        final_report = self._compile_report(introduction, content, conclusion)
+        final_report = self._compile_report(
+            report.introduction, report.content, report.conclusion
+        )
         
         logger.info("Final report generation completed")
         return final_report
     
-    def _generate_content(self, sections: List[str], topic: str) -> str:
-        """Generate main report content"""
-        sections_text = chr(10).join(sections)
-        prompt = PromptTemplates.FINAL_REPORT_WRITER.format(
-            topic=topic,
-            sections=sections_text
-        )
-        
-        messages = [
-            SystemMessage(content=prompt),
-            HumanMessage(content="Write a report based upon these memos.")
-        ]
-        
-        content = self.llm_service.invoke(messages)
-        return content.content
-    
-    def _generate_intro_conclusion(
-        self,
-        sections: List[str],
-        topic: str,
-        section_type: str
-    ) -> str:
-        """Generate introduction or conclusion"""
-        sections_text = chr(10).join(sections)
-        prompt = PromptTemplates.INTRO_CONCLUSION_WRITER.format(
+    async def _generate_report_parts(self, sections: List[str], topic: str) -> FinalReport:
+        """Generate introduction, content and conclusion together"""
+        sections_text = "\n".join(sections)
+        prompt = PromptTemplates.FINAL_REPORT_ALL.format(
             topic=topic,
             sections=sections_text
         )
         
-        instruction = (
-            "Write the report introduction"
-            if section_type == "introduction"
-            else "Write the report conclusion"
-        )
-        
         messages = [
             SystemMessage(content=prompt),
-            HumanMessage(content=instruction)
+            HumanMessage(content="Write the introduction, content and conclusion based upon these memos.")
         ]
         
-        result = self.llm_service.invoke(messages)
-        return result.content
+        structured_llm = self.llm_service.get_structured_llm(FinalReport)
+        return await structured_llm.ainvoke(messages)
     
     def _compile_report(
         self,
@@ -237,18 +276,15 @@ class ReportWriter:
             content = content.replace("## Insights", "").strip()
         
         # Extract sources if present
-        sources = None
-        if "## Sources" in content:
-            try:
-                content, sources = content.split("\n## Sources\n", 1)
-            except:
-                sources = None
-        
-        # Compile report
-        final_report = introduction + "\n\n---\n\n" + content + "\n\n---\n\n" + conclusion
+        head, separator, sources = content.partition("\n## Sources\n")
+        if separator:
+            content = head
+        else:
+            sources = None
         
-        # Add sources if available
+        # Compile report, adding sources if available
+        parts = ["\n\n---\n\n".join((introduction, content, conclusion))]
         if sources is not None:
-            final_report += "\n\n## Sources\n" + sources
+            parts.append(sources)
         
-        return final_report
\ No newline at end of file
+        return "\n\n## Sources\n".join(parts)
\ No newline at end of file
@@ -2,14 +2,16 @@
 Core workflow orchestration for the AI Research Assistant
 """
 import logging
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Optional, Callable, Union
 from dataclasses import dataclass
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+import threading
 
 from models import Analyst, ResearchConfig, ResearchResults
 from agents import AnalystGenerator, InterviewAgent, ReportWriter
 from services import ServiceManager
+from config import settings
 
 
 logger = logging.getLogger(__name__)
@@ -20,6 +22,7 @@ class WorkflowCallbacks:
     """Callbacks for workflow progress updates"""
     on_progress: Optional[Callable[[float, str], None]] = None
     on_analyst_created: Optional[Callable[[List[Analyst]], None]] = None
+    on_interview_gathered: Optional[Callable[[str], None]] = None
     on_interview_complete: Optional[Callable[[str, str], None]] = None
     on_section_complete: Optional[Callable[[str], None]] = None
     on_error: Optional[Callable[[str], None]] = None
@@ -36,6 +39,7 @@ class ResearchWorkflow:
             service_manager.search_service
         )
         self.report_writer = ReportWriter(service_manager.llm_service)
+        self._progress_q: queue.SimpleQueue = queue.SimpleQueue()
     
     def run_research(
         self,
@@ -52,25 +56,52 @@ class ResearchWorkflow:
         Returns:
             ResearchResults object containing all outputs
         """
+        return asyncio.run(self.arun_research(config, callbacks))
+    
+    async def arun_research(
+        self,
+        config: ResearchConfig,
+        callbacks: Optional[WorkflowCallbacks] = None
+    ) -> ResearchResults:
+        """Run the complete research workflow on the current event loop"""
         if callbacks is None:
             callbacks = WorkflowCallbacks()
         
+        # Search results are shared across analysts within a single run only
+        self.service_manager.search_service.clear_cache()
+        
+        drain_thread = self._start_progress_drain(callbacks)
+        try:
+            async with self.service_manager:
+                return await self._run_steps(config, callbacks)
+        finally:
+            if drain_thread is not None:
+                self._progress_q.put_nowait(None)
+                # Wait off the loop, which may be running other workflows
+                await asyncio.to_thread(drain_thread.join)
+    
+    async def _run_steps(
+        self,
+        config: ResearchConfig,
+        callbacks: WorkflowCallbacks
+    ) -> ResearchResults:
+        """Run the workflow steps, reporting failures through callbacks"""
         try:
             # Step 1: Generate analysts (10-25% progress)
             self._update_progress(callbacks, 10, "Generating research analysts...")
-            analysts = self._generate_analysts(config, callbacks)
+            analysts = await self._generate_analysts(config, callbacks)
             self._update_progress(callbacks, 25, f"Generated {len(analysts)} analysts")
             
             # Step 2: Conduct interviews (25-70% progress)
             self._update_progress(callbacks, 30, "Starting research interviews...")
-            sections = self._conduct_interviews(
+            sections = await self._conduct_interviews(
                 analysts, config.topic, config.max_turns, callbacks
             )
             self._update_progress(callbacks, 70, "All interviews completed")
             
             # Step 3: Generate final report (70-100% progress)
             self._update_progress(callbacks, 85, "Generating final report...")
-            final_report = self._generate_report(sections, config.topic, callbacks)
+            final_report = await self._generate_report(sections, config.topic, callbacks)
             self._update_progress(callbacks, 100, "Research completed successfully!")
             
             # Create results
@@ -90,13 +121,13 @@ class ResearchWorkflow:
                 callbacks.on_error(error_msg)
             raise
     
-    def _generate_analysts(
+    async def _generate_analysts(
         self,
         config: ResearchConfig,
         callbacks: WorkflowCallbacks
     ) -> List[Analyst]:
         """Generate analyst personas"""
-        analysts = self.analyst_generator.generate_analysts(
+        analysts = await self.analyst_generator.generate_analysts(
             topic=config.topic,
             max_analysts=config.max_analysts,
             human_feedback=config.human_feedback
@@ -107,21 +138,68 @@ class ResearchWorkflow:
         
         return analysts
     
-    def _conduct_interviews(
+    async def _conduct_interviews(
         self,
         analysts: List[Analyst],
         topic: str,
         max_turns: int,
         callbacks: WorkflowCallbacks
     ) -> List[str]:
-        """Conduct interviews with all analysts"""
-        sections = []
+        """Conduct interviews with all analysts, then write their sections concurrently"""
+        contexts = await self._gather_contexts(analysts, topic, max_turns, callbacks)
+        
+        self._update_progress(callbacks, 60, "Writing report sections...")
+        sections: List[str] = [""] * len(analysts)
+        completed = []
+        for i, (analyst, context) in enumerate(zip(analysts, contexts)):
+            if isinstance(context, Exception):
+                sections[i] = self._error_section(analyst, context)
+            else:
+                completed.append(i)
+        
+        # Sections are reported in completion order
+        async for index, result in self.interview_agent.write_sections_as_completed(
+            [(analysts[i], contexts[i]) for i in completed],
+            batch_size=settings.section_batch_size
+        ):
+            i = completed[index]
+            analyst = analysts[i]
+            if isinstance(result, Exception):
+                sections[i] = self._error_section(analyst, result)
+                continue
+            
+            sections[i] = result
+            
+            # Notify completion
+            if callbacks.on_interview_complete:
+                callbacks.on_interview_complete(analyst.name, result)
+            
+            if callbacks.on_section_complete:
+                callbacks.on_section_complete(result)
+        
+        return sections
+    
+    @staticmethod
+    def _error_section(analyst: Analyst, error: Exception) -> str:
+        """Log a failed interview and build its placeholder section"""
+        logger.error(f"Interview failed for {analyst.name}: {str(error)}")
+        return f"## Error\nInterview with {analyst.name} failed: {str(error)}"
+    
+    async def _gather_contexts(
+        self,
+        analysts: List[Analyst],
+        topic: str,
+        max_turns: int,
+        callbacks: WorkflowCallbacks
+    ) -> List[Union[List[str], Exception]]:
+        """Run the interview Q&A for each analyst in turn"""
+        contexts = []
         total_analysts = len(analysts)
         
         for i, analyst in enumerate(analysts):
             try:
                 # Update progress
-                progress = 30 + (i * 40 // total_analysts)
+                progress = 30 + (i * 30 // total_analysts)
                 self._update_progress(
                     callbacks,
                     progress,
@@ -129,35 +207,28 @@ class ResearchWorkflow:
                 )
                 
                 # Conduct interview
-                section = self.interview_agent.conduct_interview(
+                contexts.append(await self.interview_agent.gather_context(
                     analyst=analyst,
                     topic=topic,
                     max_turns=max_turns
-                )
-                sections.append(section)
-                
-                # Notify completion
-                if callbacks.on_interview_complete:
-                    callbacks.on_interview_complete(analyst.name, section)
+                ))
                 
-                if callbacks.on_section_complete:
-                    callbacks.on_section_complete(section)
+                if callbacks.on_interview_gathered:
+                    callbacks.on_interview_gathered(analyst.name)
                     
             except Exception as e:
-                error_msg = f"Interview failed for {analyst.name}: {str(e)}"
-                logger.error(error_msg)
-                sections.append(f"## Error\nInterview with {analyst.name} failed: {str(e)}")
+                contexts.append(e)
         
-        return sections
+        return contexts
     
-    def _generate_report(
+    async def _generate_report(
         self,
         sections: List[str],
         topic: str,
         callbacks: WorkflowCallbacks
     ) -> str:
         """Generate the final report"""
-        final_report = self.report_writer.write_report(sections, topic)
+        final_report = await self.report_writer.write_report(sections, topic)
         return final_report
     
     def _update_progress(
@@ -166,71 +237,100 @@ class ResearchWorkflow:
         progress: float,
         message: str
     ):
-        """Update progress through callback"""
+        """Queue a progress update for the drain thread"""
         if callbacks.on_progress:
-            callbacks.on_progress(progress, message)
+            self._progress_q.put_nowait((progress, message))
+    
+    def _start_progress_drain(
+        self,
+        callbacks: WorkflowCallbacks
+    ) -> Optional[threading.Thread]:
+        """Start a thread that delivers queued progress updates to the callback"""
+        if not callbacks.on_progress:
+            return None
+        
+        drain_thread = threading.Thread(
+            target=self._drain_progress,
+            args=(callbacks.on_progress,),
+            daemon=True
+        )
+        drain_thread.start()
+        return drain_thread
+    
+    def _drain_progress(self, on_progress: Callable[[float, str], None]):
+        """Deliver progress updates in order until the end-of-run sentinel"""
+        while True:
+            update = self._progress_q.get()
+            if update is None:
+                return
+            try:
+                on_progress(*update)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {str(e)}")
 
 
 class ParallelResearchWorkflow(ResearchWorkflow):
-    """Research workflow with parallel interview execution"""
+    """Research workflow with concurrent interview execution"""
     
     def __init__(self, service_manager: ServiceManager, max_workers: int = 3):
         super().__init__(service_manager)
         self.max_workers = max_workers
     
-    def _conduct_interviews(
+    async def _gather_contexts(
         self,
         analysts: List[Analyst],
         topic: str,
         max_turns: int,
         callbacks: WorkflowCallbacks
-    ) -> List[str]:
-        """Conduct interviews in parallel"""
-        sections = [None] * len(analysts)
-        completed = 0
+    ) -> List[Union[List[str], Exception]]:
+        """Fan out all interviews, bounded by a semaphore of max_workers"""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        progress = {"completed": 0}
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all interview tasks
-            future_to_index = {
-                executor.submit(
-                    self.interview_agent.conduct_interview,
+        return await asyncio.gather(*(
+            self._bounded_interview(
+                semaphore, analyst, topic, max_turns, len(analysts), progress, callbacks
+            )
+            for analyst in analysts
+        ))
+    
+    async def _bounded_interview(
+        self,
+        semaphore: asyncio.Semaphore,
+        analyst: Analyst,
+        topic: str,
+        max_turns: int,
+        total_analysts: int,
+        progress: Dict[str, int],
+        callbacks: WorkflowCallbacks
+    ) -> Union[List[str], Exception]:
+        """Run a single interview once a semaphore slot is free"""
+        async with semaphore:
+            try:
+                context = await self.interview_agent.gather_context(
                     analyst=analyst,
                     topic=topic,
                     max_turns=max_turns
-                ): i
-                for i, analyst in enumerate(analysts)
-            }
-            
-            # Process completed interviews
-            for future in as_completed(future_to_index):
-                index = future_to_index[future]
-                analyst = analysts[index]
-                
-                try:
-                    section = future.result()
-                    sections[index] = section
-                    completed += 1
-                    
-                    # Update progress
-                    progress = 30 + (completed * 40 // len(analysts))
-                    self._update_progress(
-                        callbacks,
-                        progress,
-                        f"Completed interview with {analyst.name} ({completed}/{len(analysts)})"
-                    )
-                    
-                    # Notify completion
-                    if callbacks.on_interview_complete:
-                        callbacks.on_interview_complete(analyst.name, section)
-                    
-                except Exception as e:
-                    error_msg = f"Interview failed for {analyst.name}: {str(e)}"
-                    logger.error(error_msg)
-                    sections[index] = f"## Error\nInterview with {analyst.name} failed: {str(e)}"
-                    completed += 1
+                )
+            except Exception as e:
+                progress["completed"] += 1
+                return e
+        
+        progress["completed"] += 1
+        completed = progress["completed"]
+        
+        # Update progress
+        self._update_progress(
+            callbacks,
+            30 + (completed * 30 // total_analysts),
+            f"Completed interview with {analyst.name} ({completed}/{total_analysts})"
+        )
+        
+        # Notify in completion order
+        if callbacks.on_interview_gathered:
+            callbacks.on_interview_gathered(analyst.name)
         
-        # Filter out None values
-        return [s for s in sections if s is not None]
+        return context
 
 
 class WorkflowFactory:
@@ -1,7 +1,6 @@
 """
 Configuration management for the AI Research Assistant
 """
-import os
 from typing import Optional
 from pydantic import Field
 try:
@@ -22,12 +21,31 @@ class Settings(BaseSettings):
     llm_model: str = Field("gpt-4o", env="LLM_MODEL")
     llm_temperature: float = Field(0.0, env="LLM_TEMPERATURE")
     
+    # Cache Configuration
+    llm_cache_enabled: bool = Field(True, env="LLM_CACHE_ENABLED")
+    llm_cache_ttl: int = Field(3600, env="LLM_CACHE_TTL")
+    llm_cache_max_entries: int = Field(1024, env="LLM_CACHE_MAX_ENTRIES")
+    llm_sqlite_cache_enabled: bool = Field(False, env="LLM_SQLITE_CACHE_ENABLED")
+    llm_cache_path: Optional[str] = Field(".langchain.db", env="LLM_CACHE_PATH")
+    redis_url: Optional[str] = Field(None, env="REDIS_URL")
+    semantic_cache_enabled: bool = Field(False, env="SEMANTIC_CACHE_ENABLED")
+    semantic_cache_threshold: float = Field(0.92, env="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_max_entries: int = Field(10000, env="SEMANTIC_CACHE_MAX_ENTRIES")
+    embedding_model: str = Field("text-embedding-3-small", env="EMBEDDING_MODEL")
+    
+    # HTTP Connection Pool Configuration
+    http_max_connections: int = Field(64, env="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(32, env="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_timeout: float = Field(60.0, env="HTTP_TIMEOUT")
+    
     # Search Configuration
     max_search_results: int = Field(3, env="MAX_SEARCH_RESULTS")
+    max_search_queries: int = Field(3, env="MAX_SEARCH_QUERIES")
     
     # Workflow Configuration
     default_max_analysts: int = Field(3, env="DEFAULT_MAX_ANALYSTS")
     default_max_turns: int = Field(2, env="DEFAULT_MAX_TURNS")
+    section_batch_size: int = Field(8, env="SECTION_BATCH_SIZE")
     
     # Application Configuration
     app_title: str = Field("AI Research Assistant", env="APP_TITLE")
@@ -52,23 +70,36 @@ except Exception:
 
 # Prompt Templates
 class PromptTemplates:
-    """Centralized prompt templates"""
+    """Centralized prompt templates
+    
+    Dynamic fields are kept at the end of each template so the static
+    instructions form a stable prefix for provider-side prompt caching.
+    """
     
     ANALYST_CREATION = """You are tasked with creating a set of AI analyst personas. Follow these instructions carefully:
 
-1. First, review the research topic:
-{topic}
+1. First, review the research topic given below.
         
-2. Examine any editorial feedback that has been optionally provided to guide creation of the analysts: 
-        
-{human_analyst_feedback}
+2. Examine any editorial feedback that has been optionally provided below to guide creation of the analysts.
     
-3. Determine the most interesting themes based upon documents and / or feedback above.
+3. Determine the most interesting themes based upon documents and / or feedback.
                     
-4. Pick the top {max_analysts} themes.
+4. Pick the top themes, as many as the requested number of analysts.
+
+5. Assign one analyst to each theme.
+
+6. For each analyst, write the opening question of their interview with an expert on the topic. In it, the analyst introduces themselves using a name that fits their persona and then asks a specific question that will surface interesting, non-obvious insights about their theme.
 
-5. Assign one analyst to each theme."""
+Research topic:
+{topic}
+
+Editorial feedback:
+{human_analyst_feedback}
+
+Number of analysts: {max_analysts}"""
 
+    END_INTERVIEW_TOKEN = "<END_INTERVIEW/>"
+    
     INTERVIEW_QUESTION = """You are an analyst tasked with interviewing an expert to learn about a specific topic. 
 
 Your goal is boil down to interesting and specific insights related to your topic.
@@ -77,35 +108,33 @@ Your goal is boil down to interesting and specific insights related to your topi
         
 2. Specific: Insights that avoid generalities and include specific examples from the expert.
 
-Here is your topic of focus and set of goals: {analyst_persona}
-        
 Begin by introducing yourself using a name that fits your persona, and then ask your question.
 
 Continue to ask questions to drill down and refine your understanding of the topic.
         
-When you are satisfied with your understanding, complete the interview with: "Thank you so much for your help!"
+When you are satisfied with your understanding, begin your message with the token <END_INTERVIEW/> and complete the interview with: "Thank you so much for your help!"
 
-Remember to stay in character throughout your response, reflecting the persona and goals provided to you."""
+Remember to stay in character throughout your response, reflecting the persona and goals provided to you.
+
+Here is your topic of focus and set of goals: {analyst_persona}"""
 
     SEARCH_QUERY_GENERATION = """You will be given a conversation between an analyst and an expert. 
 
-Your goal is to generate a well-structured query for use in retrieval and / or web-search related to the conversation.
+Your goal is to generate well-structured queries for use in retrieval and / or web-search related to the conversation.
         
 First, analyze the full conversation.
 
 Pay particular attention to the final question posed by the analyst.
 
-Convert this final question into a well-structured web search query"""
+Convert this final question into well-structured web search queries, each covering a different aspect of the question.
 
-    EXPERT_ANSWER = """You are an expert being interviewed by an analyst.
+Generate at most {max_queries} queries."""
 
-Here is analyst area of focus: {goals}. 
+    EXPERT_ANSWER = """You are an expert being interviewed by an analyst.
         
 You goal is to answer a question posed by the interviewer.
 
-To answer question, use this context:
-        
-{context}
+To answer question, use the context provided in the final message of the conversation.
 
 When answering questions, follow these guidelines:
         
@@ -123,7 +152,9 @@ When answering questions, follow these guidelines:
         
 [1] assistant/docs/llama3_1.pdf, page 7 
         
-And skip the addition of the brackets as well as the Document source preamble in your citation."""
+And skip the addition of the brackets as well as the Document source preamble in your citation.
+
+Here is analyst area of focus: {goals}"""
 
     SECTION_WRITER = """You are an expert technical writer. 
             
@@ -141,8 +172,7 @@ a. Title (## header)
 b. Summary (### header)
 c. Sources (### header)
 
-4. Make your title engaging based upon the focus area of the analyst: 
-{analyst_description}
+4. Make your title engaging based upon the focus area of the analyst given at the end of these instructions.
 
 5. For the summary section:
 - Set up summary with general background / context related to the focus area of the analyst
@@ -174,25 +204,28 @@ There should be no redundant sources. It should simply be:
 8. Final review:
 - Ensure the report follows the required structure
 - Include no preamble before the title of the report
-- Check that all guidelines have been followed"""
+- Check that all guidelines have been followed
 
-    FINAL_REPORT_WRITER = """You are a technical writer creating a report on this overall topic: 
+Focus area of the analyst:
+{analyst_description}"""
 
-{topic}
+    FINAL_REPORT_ALL = """You are a technical writer creating a report on the overall topic given at the end of these instructions.
     
 You have a team of analysts. Each analyst has done two things: 
 
 1. They conducted an interview with an expert on a specific sub-topic.
 2. They write up their finding into a memo.
 
-Your task: 
+Your task is to write three parts of the report from these memos: the main content, an introduction and a conclusion.
+
+For the main content: 
 
 1. You will be given a collection of memos from your analysts.
 2. Think carefully about the insights from each memo.
 3. Consolidate these into a crisp overall summary that ties together the central ideas from all of the memos. 
 4. Summarize the central points in each memo into a cohesive single narrative.
 
-To format your report:
+To format the main content:
  
 1. Use markdown formatting. 
 2. Include no pre-amble for the report.
@@ -206,28 +239,18 @@ To format your report:
 [1] Source 1
 [2] Source 2
 
-Here are the memos from your analysts to build your report from: 
-
-{sections}"""
-
-    INTRO_CONCLUSION_WRITER = """You are a technical writer finishing a report on {topic}
+For the introduction and conclusion:
 
-You will be given all of the sections of the report.
+1. Write a crisp and compelling section, targeting around 100 words.
+2. Crisply preview (for introduction) or recap (for conclusion) all of the sections of the report.
+3. Include no pre-amble for either section.
+4. Use markdown formatting. 
+5. For your introduction, create a compelling title and use the # header for the title.
+6. For your introduction, use ## Introduction as the section header. 
+7. For your conclusion, use ## Conclusion as the section header.
 
-You job is to write a crisp and compelling introduction or conclusion section.
+Overall topic: {topic}
 
-The user will instruct you whether to write the introduction or conclusion.
-
-Include no pre-amble for either section.
-
-Target around 100 words, crisply previewing (for introduction) or recapping (for conclusion) all of the sections of the report.
-
-Use markdown formatting. 
-
-For your introduction, create a compelling title and use the # header for the title.
-
-For your introduction, use ## Introduction as the section header. 
-
-For your conclusion, use ## Conclusion as the section header.
+Here are the memos from your analysts to build your report from: 
 
-Here are the sections to reflect on for writing: {sections}"""
\ No newline at end of file
+{sections}"""
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""
+LLM response caching for the AI Research Assistant
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, List, Optional, Protocol, Tuple
+
+# Import Redis with fallback
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+_sqlite_cache_installed = False
+
+
+def install_sqlite_cache() -> None:
+    """Install LangChain's global SQLite cache for deterministic calls
+    
+    Covers every ChatOpenAI call, including structured output, and persists
+    across processes with no expiry or size limit, so it is opt-in for local
+    development reruns. Runs once; later calls are no-ops.
+    """
+    global _sqlite_cache_installed
+    if _sqlite_cache_installed:
+        return
+    _sqlite_cache_installed = True
+    
+    if not (settings.llm_sqlite_cache_enabled and settings.llm_cache_path):
+        return
+    if settings.llm_temperature > 0:
+        return
+    
+    try:
+        from langchain_core.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+        
+        set_llm_cache(SQLiteCache(database_path=settings.llm_cache_path))
+        logger.info(f"Initialized SQLite LLM cache at {settings.llm_cache_path}")
+    except Exception as e:
+        logger.warning(f"SQLite LLM cache unavailable: {str(e)}")
+
+
+class CacheBackend(Protocol):
+    """Storage backend for cached LLM responses"""
+    
+    # Whether calls may block on I/O and should be kept off the event loop
+    blocking: bool
+    
+    def get(self, key: str) -> Optional[str]:
+        ...
+    
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ...
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry"""
+    
+    blocking = False
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached value, dropping it if expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisCacheBackend:
+    """Redis-backed cache shared across processes"""
+    
+    blocking = True
+    
+    def __init__(self, url: str):
+        if redis is None:
+            raise ImportError("Redis cache not available. Please install redis")
+        
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        # from_url connects lazily, so check the server is reachable now
+        self._client.ping()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached value"""
+        return self._client.get(key)
+    
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """Store a value with optional expiry"""
+        self._client.set(key, value, ex=ttl)
+
+
+class LLMCache:
+    """Exact-match cache for deterministic LLM responses"""
+    
+    def __init__(self, backend: CacheBackend, ttl: Optional[int] = 3600):
+        self.backend = backend
+        self.ttl = ttl
+    
+    @classmethod
+    def from_settings(cls) -> "LLMCache":
+        """Create cache using Redis when configured, memory otherwise"""
+        backend = None
+        if settings.redis_url:
+            try:
+                backend = RedisCacheBackend(settings.redis_url)
+                logger.info("Initialized Redis LLM cache")
+            except Exception as e:
+                logger.warning(f"Redis cache unavailable, using memory cache: {str(e)}")
+        
+        if backend is None:
+            backend = MemoryCacheBackend(settings.llm_cache_max_entries)
+        
+        return cls(backend, ttl=settings.llm_cache_ttl)
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: List[Any]) -> str:
+        """Build a SHA-256 key over the model settings and messages"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "temp": temperature,
+                "msgs": [(m.type, m.name, m.content) for m in messages]
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, treating backend errors as misses"""
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            return None
+    
+    def set(self, key: str, value: str) -> None:
+        """Store a response, ignoring backend errors"""
+        try:
+            self.backend.set(key, value, ttl=self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {str(e)}")
+    
+    async def aget(self, key: str) -> Optional[str]:
+        """Get a cached response, keeping blocking backends off the event loop"""
+        if not self.backend.blocking:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aset(self, key: str, value: str) -> None:
+        """Store a response, keeping blocking backends off the event loop"""
+        if not self.backend.blocking:
+            self.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+
+class SemanticCache:
+    """Similarity-based cache over prompt embeddings
+    
+    Serves a stored response when a new prompt's embedding has cosine
+    similarity of at least ``threshold`` with a cached one. Vectors are kept
+    normalized in one matrix, so a lookup is a single inner-product scan.
+    The matrix grows geometrically up to ``max_entries`` rows, and numpy is
+    only imported once the cache is used.
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str],
+        threshold: float = 0.92,
+        max_entries: int = 10000
+    ):
+        self.api_key = api_key
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embeddings = None
+        self._vectors: Optional[np.ndarray] = None
+        self._last_used: Optional[np.ndarray] = None
+        self._responses: List[str] = []
+        self._clock = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def embeddings(self):
+        """Lazy initialization of the embedding model"""
+        if self._embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+            
+            self._embeddings = OpenAIEmbeddings(
+                model=settings.embedding_model,
+                api_key=self.api_key
+            )
+        return self._embeddings
+    
+    @staticmethod
+    def prompt_text(messages: List[Any]) -> str:
+        """Flatten messages into the text that gets embedded"""
+        return "\n\n".join(f"{m.type}: {m.content}" for m in messages)
+    
+    def embed(self, messages: List[Any]) -> Optional[np.ndarray]:
+        """Embed messages, returning None if embedding fails"""
+        try:
+            return self._normalize(self.embeddings.embed_query(self.prompt_text(messages)))
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)}")
+            return None
+    
+    async def aembed(self, messages: List[Any]) -> Optional[np.ndarray]:
+        """Embed messages asynchronously, returning None if embedding fails"""
+        try:
+            vector = await self.embeddings.aembed_query(self.prompt_text(messages))
+            return self._normalize(vector)
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)}")
+            return None
+    
+    def lookup(self, embedding: Optional[np.ndarray]) -> Optional[str]:
+        """Get the closest cached response above the similarity threshold"""
+        if embedding is None:
+            return None
+        
+        import numpy as np
+        
+        with self._lock:
+            if not self._responses:
+                return None
+            
+            scores = self._vectors[:len(self._responses)] @ embedding
+            index = int(np.argmax(scores))
+            if scores[index] < self.threshold:
+                return None
+            
+            self._clock += 1
+            self._last_used[index] = self._clock
+            return self._responses[index]
+    
+    def add(self, embedding: Optional[np.ndarray], response: str) -> None:
+        """Store a response, evicting the least recently used entry when full"""
+        if embedding is None:
+            return
+        
+        import numpy as np
+        
+        with self._lock:
+            size = len(self._responses)
+            if size < self.max_entries:
+                self._reserve(size + 1, embedding.shape[0])
+                index = size
+                self._responses.append(response)
+            else:
+                index = int(np.argmin(self._last_used))
+                self._responses[index] = response
+            
+            self._clock += 1
+            self._vectors[index] = embedding
+            self._last_used[index] = self._clock
+    
+    def _reserve(self, size: int, dim: int) -> None:
+        """Grow storage geometrically so it holds at least ``size`` entries"""
+        import numpy as np
+        
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if size <= capacity:
+            return
+        
+        new_capacity = min(self.max_entries, max(size, capacity * 2, 64))
+        vectors = np.zeros((new_capacity, dim), dtype=np.float32)
+        last_used = np.zeros(new_capacity, dtype=np.int64)
+        if capacity:
+            vectors[:capacity] = self._vectors
+            last_used[:capacity] = self._last_used
+        self._vectors = vectors
+        self._last_used = last_used
+    
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Scale a vector to unit length so inner product is cosine similarity"""
+        import numpy as np
+        
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
@@ -1,20 +1,27 @@
 """
 Data models for the AI Research Assistant
 """
+from functools import cached_property
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Analyst(BaseModel):
     """Represents an AI analyst persona"""
+    model_config = ConfigDict(frozen=True)
+    
     affiliation: str = Field(description="Primary affiliation of the analyst.")
     name: str = Field(description="Name of the analyst.")
     role: str = Field(description="Role of the analyst in the context of the topic.")
     description: str = Field(description="Description of the analyst focus, concerns, and motives.")
+    opening_question: str = Field(
+        default="",
+        description="Analyst's opening question to the expert, including a short self-introduction."
+    )
     
-    @property
+    @cached_property
     def persona(self) -> str:
-        """Generate the persona description for the analyst"""
+        """Persona description for the analyst, built once per instance"""
         return (
             f"Name: {self.name}\n"
             f"Role: {self.role}\n"
@@ -35,6 +42,20 @@ class SearchQuery(BaseModel):
     search_query: str = Field(None, description="Search query for retrieval.")
 
 
+class SearchQueries(BaseModel):
+    """Complementary search queries for a single interview turn"""
+    queries: List[str] = Field(
+        description="Distinct search queries for retrieval, each covering a different aspect."
+    )
+
+
+class FinalReport(BaseModel):
+    """All generated parts of the final report"""
+    introduction: str = Field(description="Report introduction, starting with the # title.")
+    content: str = Field(description="Main report content, starting with ## Insights and ending with ## Sources.")
+    conclusion: str = Field(description="Report conclusion, starting with ## Conclusion.")
+
+
 class ResearchConfig(BaseModel):
     """Configuration for research workflow"""
     topic: str = Field(description="Research topic")
@@ -1,60 +1,328 @@
 """
 External service integrations for the AI Research Assistant
 """
+from __future__ import annotations
+
+import asyncio
+import importlib.util
 import logging
-from typing import Optional, List, Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage
-
-# Import Tavily with fallback
-try:
-    from langchain_tavily import TavilySearchResults
-except ImportError:
-    try:
-        from langchain_community.tools.tavily_search import TavilySearchResults
-    except ImportError:
-        TavilySearchResults = None
+import threading
+from collections import ChainMap
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Optional, List, Dict, Any, Tuple
+from langchain_core.messages import AIMessage
 
 from config import settings
+from llm_cache import LLMCache, SemanticCache, install_sqlite_cache
+from models import FinalReport, Perspectives, SearchQueries
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_openai import ChatOpenAI
 
 
 logger = logging.getLogger(__name__)
 
+# Search result document template, with defaults for missing fields
+_DOC_FMT = '<Document href="{url}"/>\n{content}\n</Document>'
+_DOC_DEFAULTS = {"url": "", "content": ""}
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Get the running event loop, None when called from sync code"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """Create a pooled async HTTP client for OpenAI calls, using HTTP/2 when available
+    
+    The pool is bound to the event loop that first uses it, so only share it
+    between calls made on that loop.
+    """
+    import httpx
+    
+    return httpx.AsyncClient(
+        http2=_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections
+        ),
+        timeout=settings.http_timeout
+    )
+
+
+class BackgroundLoop:
+    """Event loop running on a daemon thread, with an HTTP pool bound to it
+    
+    The loop and the pool are created and shut down together, since the
+    pool may only be used from the loop that first used it.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.http_async_client = create_async_http_client()
+        self._thread = threading.Thread(target=self._run, name="research-loop", daemon=True)
+        self._thread.start()
+    
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+    
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def close(self) -> None:
+        """Shut down once in-flight work finishes, closing the pool and the loop"""
+        self.submit(self._shutdown())
+    
+    async def _shutdown(self) -> None:
+        current = asyncio.current_task()
+        await asyncio.gather(
+            *(task for task in asyncio.all_tasks() if task is not current),
+            return_exceptions=True
+        )
+        await self.http_async_client.aclose()
+        self.loop.stop()
+
+
+_background_loop: Optional[BackgroundLoop] = None
+
+
+def start_background_loop() -> BackgroundLoop:
+    """Start a new background loop, shutting down the one it replaces"""
+    global _background_loop
+    if _background_loop is not None:
+        _background_loop.close()
+    _background_loop = BackgroundLoop()
+    return _background_loop
+
+
+def create_llm_caches(
+    api_key: Optional[str] = None
+) -> Tuple[Optional[LLMCache], Optional[SemanticCache]]:
+    """Create the LLM response caches enabled in settings"""
+    cache = LLMCache.from_settings() if settings.llm_cache_enabled else None
+    semantic_cache = (
+        SemanticCache(
+            api_key,
+            threshold=settings.semantic_cache_threshold,
+            max_entries=settings.semantic_cache_max_entries
+        )
+        if settings.semantic_cache_enabled
+        else None
+    )
+    return cache, semantic_cache
+
+
+def _load_tavily() -> Any:
+    """Import the Tavily search tool on first use, None if unavailable"""
+    try:
+        from langchain_tavily import TavilySearchResults
+    except ImportError:
+        try:
+            from langchain_community.tools.tavily_search import TavilySearchResults
+        except ImportError:
+            return None
+    return TavilySearchResults
+
 
 class LLMService:
     """Service for managing LLM interactions"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+        caches: Optional[Tuple[Optional[LLMCache], Optional[SemanticCache]]] = None
+    ):
         self.api_key = api_key or settings.openai_api_key
         self._llm = None
+        self._llm_loop = None
+        # A pool passed in is owned by the caller and never closed here
+        self._shared_async_client = http_async_client
+        self._http_async_client = None
+        self._structured_cache: Dict[type, Any] = {}
+        self.cache, self.semantic_cache = (
+            caches if caches is not None else create_llm_caches(self.api_key)
+        )
     
     @property
     def llm(self) -> ChatOpenAI:
         """Lazy initialization of LLM"""
+        loop = _running_loop()
+        if self._llm is not None and loop is not self._llm_loop:
+            # The async connection pool is bound to the loop that created it
+            self._reset_llm()
+        
         if self._llm is None:
             if not self.api_key:
                 raise ValueError("OpenAI API key not provided")
             
+            from langchain_openai import ChatOpenAI
+            
+            # Without a running loop there is nothing to bind a pool to
+            http_async_client = None
+            if loop is not None:
+                http_async_client = self._shared_async_client
+                if http_async_client is None:
+                    self._http_async_client = http_async_client = create_async_http_client()
+            self._llm_loop = loop
+            
             self._llm = ChatOpenAI(
                 model=settings.llm_model,
                 temperature=settings.llm_temperature,
-                api_key=self.api_key
+                api_key=self.api_key,
+                http_async_client=http_async_client
             )
             logger.info(f"Initialized LLM with model: {settings.llm_model}")
+            install_sqlite_cache()
+            
+            # Pre-build the structured runnables used by every research run
+            for output_class in (Perspectives, SearchQueries, FinalReport):
+                self.get_structured_llm(output_class)
         
         return self._llm
     
+    def _reset_llm(self) -> None:
+        """Drop the LLM and everything built on top of it, closing its async pool"""
+        client, loop = self._http_async_client, self._llm_loop
+        self._llm = None
+        self._llm_loop = None
+        self._http_async_client = None
+        self._structured_cache.clear()
+        
+        # The pool can only be closed on the loop it belongs to
+        if client is not None and not client.is_closed and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    
+    async def aclose(self) -> None:
+        """Close the async connection pool this service created, if it belongs to the running loop"""
+        if self._http_async_client is not None and self._llm_loop is _running_loop():
+            await self._http_async_client.aclose()
+            self._reset_llm()
+    
     def get_structured_llm(self, output_class):
-        """Get LLM with structured output"""
-        return self.llm.with_structured_output(output_class)
+        """Get LLM with structured output, built once per output class"""
+        # Resolve the LLM first so a change of event loop drops stale runnables
+        llm = self.llm
+        structured_llm = self._structured_cache.get(output_class)
+        if structured_llm is None:
+            structured_llm = llm.with_structured_output(output_class)
+            self._structured_cache[output_class] = structured_llm
+        return structured_llm
+    
+    def _cache_key(self, messages: List[Any]) -> Optional[str]:
+        """Cache key for deterministic calls, None when caching does not apply"""
+        if self.cache is None or settings.llm_temperature > 0:
+            return None
+        return LLMCache.make_key(settings.llm_model, settings.llm_temperature, messages)
+    
+    def _use_semantic_cache(self) -> bool:
+        """Whether the semantic cache applies to this call"""
+        return self.semantic_cache is not None and settings.llm_temperature == 0
+    
+    def _store(self, key: Optional[str], embedding: Any, content: str) -> None:
+        """Store a fresh response in the enabled caches"""
+        if key is not None:
+            self.cache.set(key, content)
+        if embedding is not None:
+            self.semantic_cache.add(embedding, content)
+    
+    async def _astore(self, key: Optional[str], embedding: Any, content: str) -> None:
+        """Store a fresh response in the enabled caches without blocking the loop"""
+        if key is not None:
+            await self.cache.aset(key, content)
+        if embedding is not None:
+            self.semantic_cache.add(embedding, content)
     
     def invoke(self, messages: List[Any]) -> Any:
-        """Invoke LLM with error handling"""
+        """Invoke LLM with caching and error handling"""
+        key = self._cache_key(messages)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug("LLM cache hit")
+                return AIMessage(content=cached)
+        
+        embedding = None
+        if self._use_semantic_cache():
+            embedding = self.semantic_cache.embed(messages)
+            cached = self.semantic_cache.lookup(embedding)
+            if cached is not None:
+                logger.debug("LLM semantic cache hit")
+                return AIMessage(content=cached)
+        
         try:
-            return self.llm.invoke(messages)
+            response = self.llm.invoke(messages)
         except Exception as e:
             logger.error(f"LLM invocation failed: {str(e)}")
             raise
+        
+        self._store(key, embedding, response.content)
+        return response
+    
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        """Invoke LLM asynchronously with caching and error handling"""
+        key = self._cache_key(messages)
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                logger.debug("LLM cache hit")
+                return AIMessage(content=cached)
+        
+        embedding = None
+        if self._use_semantic_cache():
+            embedding = await self.semantic_cache.aembed(messages)
+            cached = self.semantic_cache.lookup(embedding)
+            if cached is not None:
+                logger.debug("LLM semantic cache hit")
+                return AIMessage(content=cached)
+        
+        try:
+            response = await self.llm.ainvoke(messages)
+        except Exception as e:
+            logger.error(f"LLM invocation failed: {str(e)}")
+            raise
+        
+        await self._astore(key, embedding, response.content)
+        return response
+    
+    async def abatch_as_completed(
+        self,
+        messages_list: List[List[Any]],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """Invoke LLM on several message lists concurrently, using the response caches
+        
+        Yields ``(index, result)`` pairs as items finish. Failed items yield
+        their exception rather than raising.
+        """
+        if not messages_list:
+            return
+        
+        semaphore = asyncio.Semaphore(max_concurrency or len(messages_list))
+        
+        async def invoke_one(index: int, messages: List[Any]) -> Tuple[int, Any]:
+            async with semaphore:
+                try:
+                    return index, await self.ainvoke(messages)
+                except Exception as e:
+                    return index, e
+        
+        for next_done in asyncio.as_completed(
+            [invoke_one(index, messages) for index, messages in enumerate(messages_list)]
+        ):
+            yield await next_done
 
 
 class SearchService:
@@ -63,11 +331,14 @@ class SearchService:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.tavily_api_key
         self._search_tool = None
+        self._query_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_searches: Dict[str, asyncio.Future] = {}
     
     @property
-    def search_tool(self) -> TavilySearchResults:
+    def search_tool(self) -> Any:
         """Lazy initialization of search tool"""
         if self._search_tool is None:
+            TavilySearchResults = _load_tavily()
             if TavilySearchResults is None:
                 raise ImportError("Tavily search not available. Please install langchain-tavily")
             
@@ -83,27 +354,75 @@ class SearchService:
         return self._search_tool
     
     def search(self, query: str) -> List[Dict[str, Any]]:
-        """Execute search with error handling"""
+        """Execute search with caching and error handling"""
+        key = self.normalize_query(query)
+        if key in self._query_cache:
+            logger.info(f"Search cache hit for: {query}")
+            return self._query_cache[key]
+        
         try:
             logger.info(f"Searching for: {query}")
             results = self.search_tool.invoke(query)
             logger.info(f"Found {len(results)} results")
+        except Exception as e:
+            logger.error(f"Search failed for query '{query}': {str(e)}")
+            return []
+        
+        self._query_cache[key] = results
+        return results
+    
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        """Execute search asynchronously with caching and error handling
+        
+        Concurrent calls for the same normalized query share one request.
+        """
+        key = self.normalize_query(query)
+        if key in self._query_cache:
+            logger.info(f"Search cache hit for: {query}")
+            return self._query_cache[key]
+        
+        pending = self._pending_searches.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._asearch_uncached(query, key))
+            self._pending_searches[key] = pending
+        else:
+            logger.info(f"Joining in-flight search for: {query}")
+        
+        # Shielded so a cancelled caller does not cancel the shared request
+        return await asyncio.shield(pending)
+    
+    async def _asearch_uncached(self, query: str, key: str) -> List[Dict[str, Any]]:
+        """Run a search and cache its results under the normalized key"""
+        try:
+            logger.info(f"Searching for: {query}")
+            results = await self.search_tool.ainvoke(query)
+            logger.info(f"Found {len(results)} results")
+            self._query_cache[key] = results
             return results
         except Exception as e:
             logger.error(f"Search failed for query '{query}': {str(e)}")
             return []
+        finally:
+            self._pending_searches.pop(key, None)
+    
+    def clear_cache(self) -> None:
+        """Forget results memoized during the previous research run"""
+        self._query_cache.clear()
+        self._pending_searches.clear()
+    
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize query case and whitespace for cache lookups"""
+        return " ".join(query.lower().split())
     
     def format_search_results(self, results: List[Dict[str, Any]]) -> str:
         """Format search results as documents"""
         if not results:
             return ""
         
-        formatted_docs = []
-        for doc in results:
-            formatted_doc = f'<Document href="{doc.get("url", "")}"/>\n{doc.get("content", "")}\n</Document>'
-            formatted_docs.append(formatted_doc)
-        
-        return "\n\n---\n\n".join(formatted_docs)
+        return "\n\n---\n\n".join(
+            _DOC_FMT.format_map(ChainMap(doc, _DOC_DEFAULTS)) for doc in results
+        )
 
 
 class ServiceManager:
@@ -112,9 +431,15 @@ class ServiceManager:
     def __init__(
         self,
         openai_api_key: Optional[str] = None,
-        tavily_api_key: Optional[str] = None
+        tavily_api_key: Optional[str] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+        llm_caches: Optional[Tuple[Optional[LLMCache], Optional[SemanticCache]]] = None
     ):
-        self.llm_service = LLMService(openai_api_key)
+        self.llm_service = LLMService(
+            openai_api_key,
+            http_async_client=http_async_client,
+            caches=llm_caches
+        )
         self.search_service = SearchService(tavily_api_key)
     
     @classmethod
@@ -122,6 +447,16 @@ class ServiceManager:
         """Create ServiceManager from environment variables"""
         return cls()
     
+    async def __aenter__(self) -> "ServiceManager":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Release pooled connections held by the services"""
+        await self.llm_service.aclose()
+    
     def validate_services(self) -> Dict[str, bool]:
         """Validate all services are properly configured"""
         validation = {
@@ -4,15 +4,22 @@ Streamlit UI for the AI Research Assistant
 import streamlit as st
 import time
 import logging
-from typing import List
+import queue
+from pathlib import Path
+from typing import Dict
 
-from models import ResearchConfig, Analyst
+from models import ResearchConfig
 from backend import WorkflowFactory, WorkflowCallbacks
-from services import ServiceManager
+from services import (
+    BackgroundLoop,
+    ServiceManager,
+    create_llm_caches,
+    start_background_loop
+)
 from utils import (
     StreamlitAPIKeyManager,
     ProgressTracker,
-    display_analyst_card,
+    render_analyst_cards,
     create_download_button,
     sanitize_filename,
     setup_logging
@@ -20,68 +27,74 @@ from utils import (
 from config import settings
 
 
-# Setup logging
-setup_logging(settings.log_level)
 logger = logging.getLogger(__name__)
 
 
-# Streamlit page config
-st.set_page_config(
-    page_title=settings.app_title,
-    page_icon=settings.app_icon,
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+@st.cache_resource(show_spinner=False)
+def _bootstrap() -> bool:
+    """One-time process setup that does not touch the page"""
+    setup_logging(settings.log_level)
+    return True
 
 
 # Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 3rem;
-        font-weight: bold;
-        text-align: center;
-        margin-bottom: 2rem;
-        color: #1f77b4;
-    }
-    .progress-container {
-        margin: 2rem 0;
-    }
-    .analyst-card {
-        border: 1px solid #ddd;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        background-color: #f8f9fa;
-        color: #212529;
-    }
-    .analyst-card strong {
-        color: #1f77b4;
-    }
-    .analyst-card em {
-        color: #6c757d;
-    }
-    .step-indicator {
-        font-weight: bold;
-        color: #28a745;
-        margin: 1rem 0;
-    }
-    .error-message {
-        color: #dc3545;
-        padding: 1rem;
-        border: 1px solid #dc3545;
-        border-radius: 5px;
-        background-color: #f8d7da;
-    }
-    .success-message {
-        color: #155724;
-        padding: 1rem;
-        border: 1px solid #c3e6cb;
-        border-radius: 5px;
-        background-color: #d4edda;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False)
+def _css_blob() -> str:
+    """Custom CSS wrapped in a style tag, read once per process"""
+    css = (Path(__file__).parent / "styles.css").read_text(encoding="utf-8")
+    return f"<style>\n{css}</style>"
+
+
+# Fragments scope reruns to one function (st.experimental_fragment before 1.37)
+_fragment = (
+    getattr(st, "fragment", None)
+    or getattr(st, "experimental_fragment", None)
+    or (lambda func: func)
+)
+
+
+@st.cache_resource(show_spinner=False)
+def _research_loop() -> BackgroundLoop:
+    """Event loop and connection pool shared by every research run
+    
+    Both live in one cached resource so they are always replaced together;
+    the loop being replaced shuts down once its runs finish.
+    """
+    return start_background_loop()
+
+
+@st.cache_resource(show_spinner=False)
+def _llm_caches(openai_key: str):
+    """LLM response caches shared by every run using the same OpenAI key"""
+    return create_llm_caches(openai_key)
+
+
+def create_service_manager(openai_key: str, tavily_key: str) -> ServiceManager:
+    """Create a ServiceManager for a single run
+    
+    Services hold per-run state such as loop-bound clients and the search
+    cache, so only the connection pool and LLM caches are shared.
+    """
+    return ServiceManager(
+        openai_api_key=openai_key,
+        tavily_api_key=tavily_key,
+        http_async_client=_research_loop().http_async_client,
+        llm_caches=_llm_caches(openai_key)
+    )
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _validate_services(openai_key: str, tavily_key: str) -> Dict[str, bool]:
+    """Validate services for a pair of API keys, rechecked every five minutes
+    
+    Validation failures raise, so only successful results are cached.
+    """
+    validation = create_service_manager(openai_key, tavily_key).validate_services()
+    if not all(validation.values()):
+        failed_services = [k for k, v in validation.items() if not v]
+        raise ValueError(f"Failed to initialize services: {', '.join(failed_services)}")
+    
+    return validation
 
 
 class ResearchAssistantApp:
@@ -102,6 +115,16 @@ class ResearchAssistantApp:
             st.session_state.research_results = None
         if 'error_message' not in st.session_state:
             st.session_state.error_message = None
+        if 'partial_interviews' not in st.session_state:
+            st.session_state.partial_interviews = []
+        if 'job_future' not in st.session_state:
+            st.session_state.job_future = None
+        if 'job_queue' not in st.session_state:
+            st.session_state.job_queue = None
+        if 'job_log' not in st.session_state:
+            st.session_state.job_log = []
+        if 'progress_tracker' not in st.session_state:
+            st.session_state.progress_tracker = None
     
     def render_header(self):
         """Render application header"""
@@ -159,16 +182,16 @@ class ResearchAssistantApp:
                 use_parallel = st.checkbox(
                     "Use Parallel Processing",
                     value=True,
-                    help="Conduct interviews in parallel for faster results"
+                    help="Conduct interviews concurrently for faster results"
                 )
                 
                 if use_parallel:
                     max_workers = st.slider(
-                        "Max Parallel Workers",
+                        "Max concurrent interviews",
                         min_value=1,
-                        max_value=5,
-                        value=3,
-                        help="Number of concurrent interviews"
+                        max_value=max_analysts,
+                        value=max_analysts,
+                        help="Number of interviews run at once; lower it if you hit API rate limits"
                     )
                 else:
                     max_workers = 1
@@ -189,7 +212,7 @@ class ResearchAssistantApp:
                 "🚀 Start Research",
                 type="primary",
                 use_container_width=True,
-                disabled=not (openai_key and tavily_key)
+                disabled=not (openai_key and tavily_key) or st.session_state.job_future is not None
             )
             
             return {
@@ -204,43 +227,34 @@ class ResearchAssistantApp:
                 "start_research": start_research
             }
     
-    def create_workflow_callbacks(self, progress_tracker: ProgressTracker) -> WorkflowCallbacks:
-        """Create callbacks for workflow progress updates"""
-        
-        def on_progress(progress: float, message: str):
-            progress_tracker.update(progress, message)
-        
-        def on_analyst_created(analysts: List[Analyst]):
-            st.session_state.analysts = analysts
-        
-        def on_error(error_message: str):
-            st.session_state.error_message = error_message
+    def create_workflow_callbacks(
+        self,
+        progress_tracker: ProgressTracker,
+        events: queue.Queue
+    ) -> WorkflowCallbacks:
+        """Create callbacks that forward workflow updates to the script thread
         
+        The workflow runs on the research loop's thread, so callbacks never
+        touch the page; the script thread drains the tracker and queue on its
+        next rerun.
+        """
         return WorkflowCallbacks(
-            on_progress=on_progress,
-            on_analyst_created=on_analyst_created,
-            on_error=on_error
+            on_progress=progress_tracker.update,
+            on_analyst_created=lambda analysts: events.put(("analysts", analysts)),
+            on_interview_gathered=lambda analyst_name: events.put(("interview_gathered", analyst_name)),
+            on_interview_complete=lambda analyst_name, section: events.put(
+                ("interview_complete", (analyst_name, section))
+            )
         )
     
-    def run_research_workflow(self, config: dict):
-        """Run the research workflow"""
-        # Create progress tracking UI
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        progress_tracker = ProgressTracker(progress_bar, status_text)
-        
+    def start_research_job(self, config: dict):
+        """Start the research workflow on the shared research loop"""
         try:
-            # Create service manager
-            service_manager = ServiceManager(
-                openai_api_key=config["openai_key"],
-                tavily_api_key=config["tavily_key"]
-            )
+            # Validate services, reusing recent results for the same keys
+            _validate_services(config["openai_key"], config["tavily_key"])
             
-            # Validate services
-            validation = service_manager.validate_services()
-            if not all(validation.values()):
-                failed_services = [k for k, v in validation.items() if not v]
-                raise ValueError(f"Failed to initialize services: {', '.join(failed_services)}")
+            # Create service manager for this run
+            service_manager = create_service_manager(config["openai_key"], config["tavily_key"])
             
             # Create research config
             research_config = ResearchConfig(
@@ -256,33 +270,113 @@ class ResearchAssistantApp:
                 parallel=config["use_parallel"],
                 max_workers=config["max_workers"]
             )
-            
-            # Create callbacks
-            callbacks = self.create_workflow_callbacks(progress_tracker)
-            
-            # Run workflow
-            results = workflow.run_research(research_config, callbacks)
-            
-            # Store results
-            st.session_state.research_results = results
-            st.session_state.final_report = results.final_report
-            st.session_state.workflow_completed = True
-            
-            # Show success message
-            progress_tracker.update(100, "✅ Research completed successfully!")
-            time.sleep(1)
-            
         except Exception as e:
             logger.error(f"Research workflow failed: {str(e)}")
             st.error(f"❌ Research failed: {str(e)}")
             st.session_state.error_message = str(e)
+            return
+        
+        # Reset results from any previous run
+        st.session_state.workflow_completed = False
+        st.session_state.analysts = None
+        st.session_state.final_report = None
+        st.session_state.research_results = None
+        st.session_state.error_message = None
+        st.session_state.partial_interviews = []
+        st.session_state.job_log = []
+        progress_tracker = ProgressTracker()
+        progress_tracker.update(0, "Starting research...")
+        st.session_state.progress_tracker = progress_tracker
+        
+        # Run workflow
+        events = queue.Queue()
+        callbacks = self.create_workflow_callbacks(progress_tracker, events)
+        st.session_state.job_future = _research_loop().submit(
+            workflow.arun_research(research_config, callbacks)
+        )
+        st.session_state.job_queue = events
     
+    def update_research_job(self) -> bool:
+        """Apply queued workflow events and collect the outcome once finished
+        
+        Returns:
+            True while the workflow is still running
+        """
+        job_future = st.session_state.job_future
+        if job_future is None:
+            return False
+        
+        # Check completion before draining so no final event is missed
+        done = job_future.done()
+        events = st.session_state.job_queue
+        while True:
+            try:
+                kind, payload = events.get_nowait()
+            except queue.Empty:
+                break
+            self._apply_job_event(kind, payload)
+        
+        if not done:
+            return True
+        
+        st.session_state.job_future = None
+        st.session_state.job_queue = None
+        st.session_state.progress_tracker = None
+        try:
+            results = job_future.result()
+        except Exception as e:
+            logger.error(f"Research workflow failed: {str(e)}")
+            st.session_state.error_message = str(e)
+            return False
+        
+        st.session_state.research_results = results
+        st.session_state.final_report = results.final_report
+        st.session_state.workflow_completed = True
+        
+        # Show success message without blocking the script thread
+        st.toast("Research completed successfully!", icon="✅")
+        return False
+    
+    def render_research_progress(self):
+        """Render progress and partial results of the running workflow"""
+        # Pick up the latest update, then render it once
+        progress_tracker = st.session_state.progress_tracker
+        progress_tracker.drain()
+        st.progress(progress_tracker.progress / 100)
+        st.text(progress_tracker.message)
+        
+        with st.status("🔬 Researching...", expanded=True):
+            for line in st.session_state.job_log:
+                st.write(line)
+            
+            # Sections written so far (expanders cannot nest inside a status)
+            partial_interviews = st.session_state.partial_interviews
+            if partial_interviews:
+                tabs = st.tabs([analyst_name for analyst_name, _ in partial_interviews])
+                for tab, (_, section) in zip(tabs, partial_interviews):
+                    with tab:
+                        st.markdown(section)
+    
+    def _apply_job_event(self, kind: str, payload):
+        """Record a single workflow event in session state"""
+        if kind == "analysts":
+            st.session_state.analysts = payload
+            st.session_state.job_log.append(
+                f"👥 Generated {len(payload)} analysts: "
+                f"{', '.join(analyst.name for analyst in payload)}"
+            )
+        elif kind == "interview_gathered":
+            st.session_state.job_log.append(f"🎤 Finished interview with {payload}")
+        elif kind == "interview_complete":
+            st.session_state.partial_interviews.append(payload)
+            st.session_state.job_log.append(f"📝 Section ready: {payload[0]}")
+    
+    @_fragment
     def display_results(self):
-        """Display research results"""
+        """Display research results, rerunning alone on its own widget interactions"""
         if st.session_state.analysts:
             with st.expander("👥 Generated Research Analysts", expanded=True):
-                for analyst in st.session_state.analysts:
-                    display_analyst_card(analyst)
+                render_analyst_cards(st.session_state.analysts)
         
         if st.session_state.final_report:
             st.markdown("---")
@@ -305,7 +399,7 @@ class ResearchAssistantApp:
             ### Features
             - **Multi-Agent System**: Multiple AI analysts with diverse perspectives
             - **Intelligent Interviews**: Dynamic Q&A sessions with web search integration
-            - **Parallel Processing**: Optional concurrent interview execution
+            - **Parallel Processing**: Optional concurrent interviews on a single asyncio event loop
             - **Comprehensive Reports**: Automated synthesis with proper citations
             - **Modular Architecture**: Clean separation of UI, workflow, and services
             
@@ -326,6 +420,9 @@ class ResearchAssistantApp:
         """Main application entry point"""
         self.render_header()
         
+        # Apply workflow updates first so the sidebar sees whether a run is active
+        self.update_research_job()
+        
         # Get configuration from sidebar
         config = self.render_sidebar()
         
@@ -333,8 +430,13 @@ class ResearchAssistantApp:
         if config["start_research"] and config["topic"]:
             if not config["openai_key"] or not config["tavily_key"]:
                 st.error("❌ Please provide both API keys to start research")
-            else:
-                self.run_research_workflow(config)
+            elif st.session_state.job_future is None:
+                self.start_research_job(config)
+        
+        # Show progress of a running workflow
+        job_running = st.session_state.job_future is not None
+        if job_running:
+            self.render_research_progress()
         
         # Display results
         if st.session_state.workflow_completed:
@@ -347,10 +449,26 @@ class ResearchAssistantApp:
         
         # Information section
         self.render_info_section()
+        
+        # Poll the workflow again shortly
+        if job_running:
+            time.sleep(0.2)
+            st.rerun()
 
 
 def main():
     """Main function to run the Streamlit app"""
+    # Page config and CSS are page elements, so they are emitted on every run
+    # rather than cached; set_page_config must be the first Streamlit call
+    st.set_page_config(
+        page_title=settings.app_title,
+        page_icon=settings.app_icon,
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    _bootstrap()
+    st.markdown(_css_blob(), unsafe_allow_html=True)
+    
     app = ResearchAssistantApp()
     app.run()
 
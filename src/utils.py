@@ -1,10 +1,17 @@
 """
 Utility functions for the AI Research Assistant
 """
+import asyncio
+import html
+import inspect
 import logging
+import os
+import queue
+import random
+import re
 import time
-from functools import wraps
-from typing import Any, Callable, Optional
+from functools import lru_cache, wraps
+from typing import Any, Callable, List, Optional
 import streamlit as st
 
 
@@ -12,7 +19,12 @@ logger = logging.getLogger(__name__)
 
 
 def setup_logging(log_level: str = "INFO"):
-    """Setup logging configuration"""
+    """Setup logging configuration, only adjusting the level if already configured"""
+    root = logging.getLogger()
+    if root.handlers:
+        root.setLevel(getattr(logging, log_level.upper()))
+        return
+    
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -24,9 +36,9 @@ def timer(func: Callable) -> Callable:
     """Decorator to time function execution"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = time.time()
+        end_time = time.perf_counter()
         logger.info(f"{func.__name__} took {end_time - start_time:.2f} seconds")
         return result
     return wrapper
@@ -37,8 +49,40 @@ def retry_with_backoff(
     backoff_factor: float = 2.0,
     exceptions: tuple = (Exception,)
 ) -> Callable:
-    """Decorator for retrying functions with exponential backoff"""
+    """Decorator for retrying functions with jittered exponential backoff
+    
+    Coroutine functions are retried with asyncio.sleep so other tasks keep
+    running on the event loop during the backoff.
+    """
+    def log_retry(func: Callable, retry_count: int, error: Exception, delay: float):
+        logger.warning(
+            f"{func.__name__} failed (attempt {retry_count}/{max_retries}): {str(error)}. "
+            f"Retrying in {delay:.2f} seconds..."
+        )
+    
     def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                retry_count = 0
+                delay = 1.0
+                
+                while retry_count < max_retries:
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions as e:
+                        retry_count += 1
+                        if retry_count >= max_retries:
+                            logger.error(f"{func.__name__} failed after {max_retries} retries")
+                            raise
+                        
+                        jittered_delay = delay * random.uniform(0.5, 1.5)
+                        log_retry(func, retry_count, e, jittered_delay)
+                        await asyncio.sleep(jittered_delay)
+                        delay *= backoff_factor
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             retry_count = 0
@@ -53,17 +97,30 @@ def retry_with_backoff(
                         logger.error(f"{func.__name__} failed after {max_retries} retries")
                         raise
                     
-                    logger.warning(
-                        f"{func.__name__} failed (attempt {retry_count}/{max_retries}): {str(e)}. "
-                        f"Retrying in {delay} seconds..."
-                    )
-                    time.sleep(delay)
+                    jittered_delay = delay * random.uniform(0.5, 1.5)
+                    log_retry(func, retry_count, e, jittered_delay)
+                    time.sleep(jittered_delay)
                     delay *= backoff_factor
             
         return wrapper
     return decorator
 
 
+def _resolve_key(env_name: str) -> Optional[str]:
+    """Look up a key in Streamlit secrets, then the environment"""
+    # Check Streamlit secrets (with proper error handling)
+    try:
+        api_key = st.secrets.get(env_name)
+        if api_key:
+            return api_key
+    except Exception:
+        # Secrets not available
+        pass
+    
+    # Check environment variables
+    return os.environ.get(env_name)
+
+
 class StreamlitAPIKeyManager:
     """Manager for handling API keys in Streamlit"""
     
@@ -84,21 +141,8 @@ class StreamlitAPIKeyManager:
         Returns:
             API key if found, None otherwise
         """
-        api_key = None
-        
-        # Check Streamlit secrets (with proper error handling)
-        try:
-            if hasattr(st, 'secrets') and env_name in st.secrets:
-                api_key = st.secrets[env_name]
-                return api_key
-        except Exception:
-            # Secrets not available or not found
-            pass
-        
-        # Check environment variables
-        import os
-        if os.getenv(env_name):
-            api_key = os.getenv(env_name)
+        api_key = _resolve_key(env_name)
+        if api_key:
             return api_key
         
         # Ask user for input
@@ -115,18 +159,43 @@ class StreamlitAPIKeyManager:
 
 
 class ProgressTracker:
-    """Helper class for tracking progress in Streamlit"""
+    """Helper class for tracking progress in Streamlit
+    
+    ``update`` may be called from any thread and never blocks: updates go
+    into a single-slot queue where the latest one wins. The script thread
+    calls ``drain`` to pick it up and render it.
+    """
     
     def __init__(self, progress_bar=None, status_text=None):
         self.progress_bar = progress_bar
         self.status_text = status_text
+        self.progress = 0.0
+        self.message = ""
+        self._q: queue.Queue = queue.Queue(maxsize=1)
     
     def update(self, progress: float, message: str):
-        """Update progress and status"""
+        """Post a progress update, replacing any update not yet drained"""
+        while True:
+            try:
+                self._q.put_nowait((progress, message))
+                return
+            except queue.Full:
+                try:
+                    self._q.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def drain(self):
+        """Apply the latest posted update; call from the script thread"""
+        try:
+            self.progress, self.message = self._q.get_nowait()
+        except queue.Empty:
+            return
+        
         if self.progress_bar:
-            self.progress_bar.progress(progress / 100)
+            self.progress_bar.progress(self.progress / 100)
         if self.status_text:
-            self.status_text.text(message)
+            self.status_text.text(self.message)
 
 
 def format_markdown_report(report: str) -> str:
@@ -151,25 +220,36 @@ def create_download_button(
     )
 
 
+def _analyst_card_html(analyst: Any) -> str:
+    """Build the HTML card for an analyst, escaping generated text"""
+    return (
+        f'<div class="analyst-card">'
+        f'<strong>{html.escape(analyst.name)}</strong> - {html.escape(analyst.role)}<br>'
+        f'<em>{html.escape(analyst.affiliation)}</em><br>'
+        f'<small>{html.escape(analyst.description)}</small>'
+        f'</div>'
+    )
+
+
 def display_analyst_card(analyst: Any) -> None:
     """Display an analyst card in Streamlit"""
-    st.markdown(f"""
-    <div class="analyst-card">
-        <strong>{analyst.name}</strong> - {analyst.role}<br>
-        <em>{analyst.affiliation}</em><br>
-        <small>{analyst.description}</small>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_analyst_card_html(analyst), unsafe_allow_html=True)
 
 
+def render_analyst_cards(analysts: List[Any]) -> None:
+    """Display all analyst cards with a single Streamlit element"""
+    st.markdown(
+        "".join(_analyst_card_html(analyst) for analyst in analysts),
+        unsafe_allow_html=True
+    )
+
+
+# Word characters (str.isalnum() or '_') and '-' are kept
+_SANITIZE_RE = re.compile(r'[^\w-]')
+
+
+@lru_cache(maxsize=256)
 def sanitize_filename(filename: str, max_length: int = 50) -> str:
     """Sanitize filename for safe file operations"""
-    # Replace spaces and special characters
-    safe_name = filename.replace(' ', '_')
-    safe_name = ''.join(c for c in safe_name if c.isalnum() or c in ('_', '-'))
-    
-    # Truncate if too long
-    if len(safe_name) > max_length:
-        safe_name = safe_name[:max_length]
-    
-    return safe_name
\ No newline at end of file
+    # Replace spaces, drop special characters and truncate if too long
+    return _SANITIZE_RE.sub('', filename.replace(' ', '_'))[:max_length]
\ No newline at end of file